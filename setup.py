@@ -127,6 +127,8 @@ if a script is vulnerable.""",
     ],
     extras_require={
         "NTLM": ["httpx-ntlm"],
+        "HTTP2": ["httpx[http2]==0.21.1"],
+        "ORJSON": ["orjson>=3.0.0"],
     },
     entry_points={
         "console_scripts": [
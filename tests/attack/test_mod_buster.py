@@ -44,7 +44,7 @@ async def test_whole_stuff():
         module.do_get = True
         await module.attack(request)
 
-        assert module.known_dirs == ["http://perdu.com/", "http://perdu.com/admin/"]
-        assert module.known_pages == ["http://perdu.com/config.inc", "http://perdu.com/admin/authconfig.php"]
+        assert module.known_dirs == {"http://perdu.com/", "http://perdu.com/admin/"}
+        assert module.known_pages == {"http://perdu.com/config.inc", "http://perdu.com/admin/authconfig.php"}
 
     await crawler.close()
@@ -1,4 +1,4 @@
-from wapitiCore.attack.attack import Mutator, Flags
+from wapitiCore.attack.attack import Mutator, Flags, _pattern_hash
 from wapitiCore.net.web import Request
 
 
@@ -91,3 +91,46 @@ def test_missing_value():
     for __ in mutator.mutate(req2):
         count += 1
     assert count == 0
+
+
+def test_placeholders():
+    req = Request(
+        "http://perdu.com/dir/page.php?file=img/logo.png",
+    )
+    req.path_id = 42
+    mutator = Mutator(
+        payloads=[
+            ("[FILE_NAME]|[FILE_NOEXT]|[PATH_ID]|[PARAM_AS_HEX]", Flags()),
+            ("[VALUE]|[DIRVALUE]|[EXTVALUE]", Flags()),
+            ("[UNKNOWN]", Flags()),
+        ]
+    )
+    payloads = [payload for __, __, payload, __ in mutator.mutate(req)]
+    assert payloads == ["page.php|page|42|66696c65", "img/logo.png|img|png", "[UNKNOWN]"]
+
+    req = Request("http://perdu.com/dir/page.php?file=logo")
+    # Value doesn't have any extension, the payload is skipped
+    mutator = Mutator(payloads=[("[EXTVALUE]", Flags())])
+    assert not list(mutator.mutate(req))
+
+
+def test_attack_pattern_deduplication():
+    mutator = Mutator(payloads=[("PAYLOAD_1", Flags()), ("PAYLOAD_2", Flags())])
+    assert len(list(mutator.mutate(Request("http://perdu.com/page.php?a=1&b=2")))) == 4
+    # Injecting in "b" gives the same attack pattern as before, only "a" is attacked
+    mutations = list(mutator.mutate(Request("http://perdu.com/page.php?a=1&b=3")))
+    assert [param_name for __, param_name, __, __ in mutations] == ["a", "a"]
+
+
+def test_pattern_hash():
+    requests = [
+        Request(
+            "http://perdu.com/page.php?p=login.php",
+            method="POST",
+            post_params=[["user", "admin"]],
+            file_params=[["file", ("pix.gif", b"GIF89a", "image/gif")]]
+        ),
+        Request("http://perdu.com/api", method="POST", post_params='{"user": "admin"}', enctype="application/json"),
+    ]
+    for request in requests:
+        assert _pattern_hash(request, request.get_params, request.post_params, request.file_params) == hash(request)
@@ -6,3 +6,13 @@ def test_payload_reader():
     payload, flags = reader.process_line("[TAB]\\0[EXTERNAL_ENDPOINT][LF][TIME][TIMEOUT] \n ")
     assert payload == "\t\0http://perdu.com/\n6"
     assert flags.payload_type == PayloadType.time
+
+
+def test_read_payloads(tmp_path):
+    payload_file = tmp_path / "payloads.txt"
+    payload_file.write_text("abc\n\ndef\nabc\nabc[TIMEOUT]\n")
+    reader = PayloadReader({"timeout": 5})
+    payloads = list(reader.read_payloads(str(payload_file)))
+    # Duplicates are dropped but the order of first occurrences is kept
+    assert [payload for payload, __ in payloads] == ["abc", "def", "abc"]
+    assert [flags.payload_type for __, flags in payloads] == [PayloadType.pattern, PayloadType.pattern, PayloadType.time]
@@ -1,7 +1,12 @@
 from time import gmtime
+import json
+import os
 import tempfile
 
-from wapitiCore.report import GENERATORS
+import pytest
+
+from wapitiCore.report import jsonreportgenerator, htmlreportgenerator
+from wapitiCore.report import GENERATORS, JSONReportGenerator
 from wapitiCore.language.language import _
 from wapitiCore.net.web import Request
 from wapitiCore.definitions import additionals, anomalies, vulnerabilities, flatten_references
@@ -108,3 +113,91 @@ def test_reports():
             # the csv report only contains vulnerabilities without the info section
             if report_format != "csv":
                 assert "123456" in report
+
+
+def test_minimal_json_report(tmp_path):
+    report_gen = JSONReportGenerator(minimal=True)
+    report_gen.set_report_info("http://perdu.com", "folder", gmtime(), "WAPITI_VERSION", None, 1)
+    report_gen.add_vulnerability_type(_("Cross Site Scripting"))
+    report_gen.add_vulnerability(
+        category=_("Cross Site Scripting"),
+        level=1,
+        request=Request("http://perdu.com/riri?foo=bar"),
+        parameter="foo",
+        info="This is dope",
+        module="xss"
+    )
+
+    output = tmp_path / "report.json"
+    report_gen.generate_report(str(output))
+
+    with open(output) as fd:
+        vulnerability = json.load(fd)["vulnerabilities"][_("Cross Site Scripting")][0]
+        assert vulnerability["path"] == "/riri"
+        assert vulnerability["info"] == "This is dope"
+        assert "http_request" not in vulnerability
+        assert "curl_command" not in vulnerability
+
+
+@pytest.mark.parametrize("use_orjson", [True, False])
+def test_json_report_indentation(tmp_path, monkeypatch, use_orjson):
+    if not use_orjson:
+        monkeypatch.setattr(jsonreportgenerator, "orjson", None)
+    elif jsonreportgenerator.orjson is None:
+        pytest.skip("orjson is not installed")
+
+    for pretty in (False, True):
+        report_gen = JSONReportGenerator(pretty=pretty) if pretty else JSONReportGenerator()
+        report_gen.set_report_info("http://perdu.com", "folder", gmtime(), "WAPITI_VERSION", None, 1)
+        report_gen.add_vulnerability_type(_("Cross Site Scripting"))
+
+        output = tmp_path / f"report_{pretty}.json"
+        report_gen.generate_report(str(output))
+
+        with open(output) as fd:
+            content = fd.read()
+            assert json.loads(content)["infos"]["target"] == "http://perdu.com"
+            if pretty:
+                assert content.startswith('{\n  "classifications": {\n')
+            else:
+                assert "\n" not in content
+                assert '"infos":{"target":"http://perdu.com"' in content
+
+
+def test_html_report_assets_sync(tmp_path, monkeypatch):
+    report_gen = GENERATORS["html"]()
+    report_gen.set_report_info("http://perdu.com", "folder", gmtime(), "WAPITI_VERSION", None, 1)
+    report_gen.generate_report(str(tmp_path))
+    first_report = report_gen.final_path
+
+    template_dir = report_gen.template_dir()
+    with open(os.path.join(template_dir, "css", "master.css"), "rb") as fd:
+        original_css = fd.read()
+
+    # An asset modified in the output directory and one left over from an older template
+    with open(tmp_path / "css" / "master.css", "wb") as fd:
+        fd.write(b"body {}")
+    with open(tmp_path / "js" / "old.js", "w") as fd:
+        fd.write("alert(1);")
+
+    copied = []
+    real_copyfile = htmlreportgenerator.copyfile
+
+    def copyfile(src, dst):
+        copied.append(os.path.relpath(dst, tmp_path))
+        return real_copyfile(src, dst)
+
+    monkeypatch.setattr(htmlreportgenerator, "copyfile", copyfile)
+    report_gen.set_report_info("http://perdu.org", "folder", gmtime(), "WAPITI_VERSION", None, 1)
+    report_gen.generate_report(str(tmp_path))
+
+    # Unchanged assets are skipped, the changed one is overwritten
+    assert copied == [os.path.join("css", "master.css")]
+    with open(tmp_path / "css" / "master.css", "rb") as fd:
+        assert fd.read() == original_css
+
+    assert not os.path.exists(tmp_path / "js" / "old.js")
+    assert os.path.isfile(tmp_path / "js" / "kube.min.js")
+    # Previously generated reports are kept
+    assert report_gen.final_path != first_report
+    assert os.path.isfile(first_report)
@@ -17,6 +17,7 @@
 # along with this program; if not, write to the Free Software
 # Foundation, Inc., 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
 import os
+import re
 import sys
 from os.path import splitext, join as path_join
 from urllib.parse import quote, urlparse
@@ -25,8 +26,8 @@ from enum import Enum
 from math import ceil
 import random
 from types import GeneratorType, FunctionType
-from binascii import hexlify
-from functools import partialmethod
+from functools import partialmethod, lru_cache
+from typing import NamedTuple
 
 from httpx import ReadTimeout, RequestError
 
@@ -113,73 +114,107 @@ COMMON_ANNOYING_PARAMETERS = (
     "CFTOKEN"
 )
 
+# Placeholders that the mutators replace in payloads, in a single pass
+_PLACEHOLDER_RE = re.compile(r"\[(FILE_NAME|FILE_NOEXT|PATH_ID|PARAM_AS_HEX|VALUE|DIRVALUE|EXTVALUE)\]")
+
+
+# Bits set in the result of _placeholders_mask for each placeholder found in a payload
+_PLACEHOLDER_BITS = {
+    "FILE_NAME": 1,
+    "FILE_NOEXT": 2,
+    "PATH_ID": 4,
+    "PARAM_AS_HEX": 8,
+    "VALUE": 16,
+    "DIRVALUE": 32,
+    "EXTVALUE": 64
+}
+_FILE_NAME_MASK = _PLACEHOLDER_BITS["FILE_NAME"] | _PLACEHOLDER_BITS["FILE_NOEXT"]
+_VALUE_MASK = _PLACEHOLDER_BITS["VALUE"] | _PLACEHOLDER_BITS["DIRVALUE"]
+_EXTVALUE_MASK = _PLACEHOLDER_BITS["EXTVALUE"]
+
+
+def _placeholders_mask(payload: str) -> int:
+    """Tell which placeholders a payload holds."""
+    # Generated payloads (taints, random strings) are unique and have no placeholder: keep them out of the cache
+    if "[" not in payload:
+        return 0
+    return _file_payload_mask(payload)
+
+
+@lru_cache(maxsize=1024)
+def _file_payload_mask(payload: str) -> int:
+    """Placeholders mask of a payload that may hold some. Those come from payload files the mutators loop over."""
+    mask = 0
+    for match in _PLACEHOLDER_RE.finditer(payload):
+        mask |= _PLACEHOLDER_BITS[match.group(1)]
+    return mask
+
+
+@lru_cache(maxsize=4096)
+def _hex_param(name: str) -> str:
+    """Value of the [PARAM_AS_HEX] placeholder. Parameter names are the same across many URLs so it is cached."""
+    return name.encode("utf-8", errors="replace").hex()
+
+
+def _request_placeholders(request: Request) -> dict:
+    """Values of the placeholders that are the same whatever the mutated parameter is."""
+    file_name = request.file_name
+    return {
+        "FILE_NAME": file_name,
+        "FILE_NOEXT": splitext(file_name)[0],
+        "PATH_ID": str(request.path_id) if isinstance(request.path_id, int) else "[PATH_ID]"
+    }
+
+
+def _replace_placeholders(payload: str, values: dict) -> str:
+    """Replace every known placeholder of the payload with its value. Placeholders missing from values are kept."""
+    return _PLACEHOLDER_RE.sub(lambda match: values.get(match.group(1), match.group(0)), payload)
+
+
+def _pattern_hash(request: Request, get_params: list, post_params, file_params: list) -> int:
+    """Hash the request with the given parameters like Request.__hash__ would, without building a new Request."""
+    if isinstance(post_params, list):
+        post_kv = tuple(tuple(param) for param in post_params)
+    else:
+        post_kv = request.enctype + str(len(post_params))
+    return hash((
+        request.method,
+        request.path,
+        tuple(tuple(param) for param in get_params),
+        post_kv,
+        tuple((param[0], param[1][0]) for param in file_params)
+    ))
+
+
+# Special sequences that PayloadReader replaces when loading a payload file
+_PAYLOAD_FILE_TAGS_RE = re.compile(r"\[(?:TAB|LF|FF|TIME|EXTERNAL_ENDPOINT|TIMEOUT)\]|\\0")
+
+
+# doesn't use uppercase letters as BeautifulSoup make some data lowercase
+_ALPHABET = "0123456789abcdefghjijklmnopqrstuvwxyz"
+
 
 def random_string(prefix: str = "w", length: int = 10) -> str:
     """Create a random unique ID that will be used to test injection."""
-    # doesn't uppercase letters as BeautifulSoup make some data lowercase
-    code = prefix + "".join(
-        [random.choice("0123456789abcdefghjijklmnopqrstuvwxyz") for __ in range(0, length - len(prefix))]
-    )
-    return code
+    return prefix + "".join(random.choices(_ALPHABET, k=length - len(prefix)))
 
 
 def random_string_with_flags():
     return random_string(), Flags()
 
 
-class Flags:
-    def __init__(
-        self,
-        payload_type=PayloadType.pattern,
-        section="",
-        method=PayloadType.get,
-        platform="all",
-        dbms="all"
-    ):
-        self.payload_type = payload_type
-        self.section = section
-        self.method = method
-        self.platform = platform
-        self.dbms = dbms
+class Flags(NamedTuple):
+    payload_type: PayloadType = PayloadType.pattern
+    section: str = ""
+    method: PayloadType = PayloadType.get
+    platform: str = "all"
+    dbms: str = "all"
 
     def with_method(self, method):
-        return Flags(
-            payload_type=self.payload_type,
-            section=self.section,
-            method=method,
-            platform=self.platform,
-            dbms=self.dbms
-        )
+        return self._replace(method=method)  # pylint: disable=no-member
 
     def with_section(self, section):
-        return Flags(
-            payload_type=self.payload_type,
-            section=section,
-            method=self.method,
-            platform=self.platform,
-            dbms=self.dbms
-        )
-
-    def __str__(self):
-        return (
-            f"Flags(payload_type={self.payload_type}, "
-            f"section='{self.section}', "
-            f"method={self.method}, "
-            f"platform='{self.platform}', "
-            f"dbms='{self.dbms}')"
-        )
-
-    def __eq__(self, other):
-        if not isinstance(other, Flags):
-            raise ValueError("Can't compare a Flags object to another kind of object")
-
-        return (
-            self.payload_type == other.payload_type and
-            self.section == other.section and
-            self.method == other.method and
-            self.platform == other.platform and
-            self.dbms == other.dbms
-        )
+        return self._replace(section=section)  # pylint: disable=no-member
 
 
 class Attack:
@@ -224,11 +259,10 @@ class Attack:
 
     def __init__(self, crawler, persister, attack_options, stop_event):
         super().__init__()
-        self._session_id = "".join([random.choice("0123456789abcdefghjijklmnopqrstuvwxyz") for __ in range(0, 6)])
+        self._session_id = "".join(random.choices(_ALPHABET, k=6))
         self.crawler = crawler
         self.persister = persister
         self._stop_event = stop_event
-        self.payload_reader = PayloadReader(attack_options)
         self.options = attack_options
 
         # List of attack urls already launched in the current module
@@ -268,9 +302,13 @@ class Attack:
 
     @property
     def payloads(self):
-        """Load the payloads from the specified file"""
+        """Load the payloads from the specified file. The list is shared between modules and must not be modified."""
         if self.PAYLOADS_FILE:
-            return self.payload_reader.read_payloads(path_join(self.DATA_DIR, self.PAYLOADS_FILE))
+            return _load_payloads(
+                path_join(self.DATA_DIR, self.PAYLOADS_FILE),
+                self.options["timeout"],
+                self.options.get("external_endpoint", "http://wapiti3.ovh/")
+            )
         return []
 
     def load_require(self, dependencies: list = None):
@@ -358,142 +396,136 @@ class Mutator:
             else:
                 yield result
 
-    def mutate(self, request: Request):
-        get_params = request.get_params
-        post_params = request.post_params
-        file_params = request.file_params
-        referer = request.referer
+    def _mutate_params(
+            self, request: Request, get_params: list, post_params: list, file_params: list,
+            params_list: list, method: PayloadType, request_placeholders: dict
+    ):
+        # params_list is the one of get_params, post_params or file_params that is mutated, as stated by method
+        is_file = method == PayloadType.file
+        file_name = request_placeholders["FILE_NAME"]
 
-        for params_list in [get_params, post_params, file_params]:
-            if params_list is get_params and not self._mutate_get:
-                continue
+        for i, __ in enumerate(params_list):
+            param_name = params_list[i][0]
+            # quote() would leave ASCII alphanumeric names (most of them) unchanged
+            if not (param_name.isascii() and param_name.isalnum()):
+                param_name = quote(param_name)
 
-            if params_list is post_params and not self._mutate_post:
+            if self._skip_list and param_name in self._skip_list:
                 continue
 
-            if params_list is file_params and not self._mutate_file:
+            if self._parameters and param_name not in self._parameters:
                 continue
 
-            for i, __ in enumerate(params_list):
-                param_name = quote(params_list[i][0])
+            saved_value = params_list[i][1]
+            if saved_value is None:
+                saved_value = ""
 
-                if self._skip_list and param_name in self._skip_list:
-                    continue
+            if is_file:
+                params_list[i][1] = ["__PAYLOAD__", params_list[i][1][1]]  # second entry is file content
+            else:
+                params_list[i][1] = "__PAYLOAD__"
+
+            pattern_hash = _pattern_hash(request, get_params, post_params, file_params)
+            if pattern_hash not in self._attack_hashes:
+                self._attack_hashes.add(pattern_hash)
+
+                # Injection takes place on the filename for file parameters
+                value = saved_value[0] if is_file else saved_value
+                placeholders = dict(
+                    request_placeholders,
+                    PARAM_AS_HEX=_hex_param(param_name),
+                    VALUE=value,
+                    DIRVALUE=value.rsplit('/', 1)[0],
+                    EXTVALUE=value.rsplit(".", 1)[-1]
+                )
+                has_extension = "." in value[:-1]
 
-                if self._parameters and param_name not in self._parameters:
-                    continue
+                for payload, original_flags in self.iter_payloads():
+                    mask = _placeholders_mask(payload)
 
-                saved_value = params_list[i][1]
-                if saved_value is None:
-                    saved_value = ""
+                    if not file_name and mask & _FILE_NAME_MASK:
+                        continue
 
-                if params_list is file_params:
-                    params_list[i][1] = ["__PAYLOAD__", params_list[i][1][1]]  # second entry is file content
-                else:
-                    params_list[i][1] = "__PAYLOAD__"
+                    if not has_extension and mask & _EXTVALUE_MASK:
+                        # Nothing that looks like an extension, skip the payload
+                        continue
 
-                attack_pattern = Request(
-                    request.path,
-                    method=request.method,
-                    get_params=get_params,
-                    post_params=post_params,
-                    file_params=file_params
-                )
+                    # no quoting: send() will do it for us
+                    if mask:
+                        payload = _replace_placeholders(payload, placeholders)
 
-                if hash(attack_pattern) not in self._attack_hashes:
-                    self._attack_hashes.add(hash(attack_pattern))
-
-                    for payload, original_flags in self.iter_payloads():
-
-                        if ("[FILE_NAME]" in payload or "[FILE_NOEXT]" in payload) and not request.file_name:
-                            continue
-
-                        # no quoting: send() will do it for us
-                        payload = payload.replace("[FILE_NAME]", request.file_name)
-                        payload = payload.replace("[FILE_NOEXT]", splitext(request.file_name)[0])
-
-                        if isinstance(request.path_id, int):
-                            payload = payload.replace("[PATH_ID]", str(request.path_id))
-
-                        payload = payload.replace(
-                            "[PARAM_AS_HEX]",
-                            hexlify(param_name.encode("utf-8", errors="replace")).decode()
-                        )
-
-                        if params_list is file_params:
-                            if "[EXTVALUE]" in payload:
-                                if "." not in saved_value[0][:-1]:
-                                    # Nothing that looks like an extension, skip the payload
-                                    continue
-                                payload = payload.replace("[EXTVALUE]", saved_value[0].rsplit(".", 1)[-1])
-
-                            # Injection takes place on the filename here
-                            payload = payload.replace("[VALUE]", saved_value[0])
-                            payload = payload.replace("[DIRVALUE]", saved_value[0].rsplit('/', 1)[0])
-                            params_list[i][1] = (payload, saved_value[1], saved_value[2])
-                            method = PayloadType.file
-                        else:
-                            if "[EXTVALUE]" in payload:
-                                if "." not in saved_value[:-1]:
-                                    # Nothing that looks like an extension, skip the payload
-                                    continue
-                                payload = payload.replace("[EXTVALUE]", saved_value.rsplit(".", 1)[-1])
-
-                            payload = payload.replace("[VALUE]", saved_value)
-                            payload = payload.replace("[DIRVALUE]", saved_value.rsplit('/', 1)[0])
-                            params_list[i][1] = payload
-                            if params_list is get_params:
-                                method = PayloadType.get
-                            else:
-                                method = PayloadType.post
-
-                        evil_req = Request(
-                            request.path,
-                            method=request.method,
-                            get_params=get_params,
-                            post_params=post_params,
-                            file_params=file_params,
-                            referer=referer,
-                            link_depth=request.link_depth
-                        )
-                        # Flags from iter_payloads should be considered as mutable (even if it's ot the case)
-                        # so let's copy them just to be sure we don't mess with them.
-                        yield evil_req, param_name, payload, original_flags.with_method(method)
-
-                params_list[i][1] = saved_value
+                    if is_file:
+                        params_list[i][1] = (payload, saved_value[1], saved_value[2])
+                    else:
+                        params_list[i][1] = payload
 
-        if not get_params and request.method == "GET" and self._qs_inject:
-            attack_pattern = Request(
-                f"{request.path}?__PAYLOAD__",
-                method=request.method,
-                referer=referer,
-                link_depth=request.link_depth
+                    evil_req = Request(
+                        request.path,
+                        method=request.method,
+                        get_params=get_params,
+                        post_params=post_params,
+                        file_params=file_params,
+                        referer=request.referer,
+                        link_depth=request.link_depth
+                    )
+                    # Flags from iter_payloads should be considered as mutable (even if it's ot the case)
+                    # so let's copy them just to be sure we don't mess with them.
+                    yield evil_req, param_name, payload, original_flags.with_method(method)
+
+            params_list[i][1] = saved_value
+
+    def mutate(self, request: Request):
+        get_keys = request.get_keys
+        if not (
+                (self._mutate_get and get_keys) or
+                (self._mutate_post and request.post_keys) or
+                (self._mutate_file and request.file_keys) or
+                (self._qs_inject and not get_keys and request.method == "GET")
+        ):
+            # Nothing to attack, don't bother copying parameters
+            return
+
+        get_params = request.get_params
+        post_params = request.post_params
+        file_params = request.file_params
+        referer = request.referer
+        request_placeholders = _request_placeholders(request)
+        file_name = request_placeholders["FILE_NAME"]
+
+        if self._mutate_get:
+            yield from self._mutate_params(
+                request, get_params, post_params, file_params, get_params, PayloadType.get, request_placeholders
+            )
+
+        if self._mutate_post:
+            yield from self._mutate_params(
+                request, get_params, post_params, file_params, post_params, PayloadType.post, request_placeholders
             )
 
-            if hash(attack_pattern) not in self._attack_hashes:
-                self._attack_hashes.add(hash(attack_pattern))
+        if self._mutate_file:
+            yield from self._mutate_params(
+                request, get_params, post_params, file_params, file_params, PayloadType.file, request_placeholders
+            )
+
+        if not get_params and request.method == "GET" and self._qs_inject:
+            pattern_hash = _pattern_hash(request, [["__PAYLOAD__", None]], [], [])
+            if pattern_hash not in self._attack_hashes:
+                self._attack_hashes.add(pattern_hash)
+
+                placeholders = dict(request_placeholders, PARAM_AS_HEX=_hex_param("QUERY_STRING"))
 
                 for payload, original_flags in self.iter_payloads():
-                    # Ignore payloads reusing existing parameter values
-                    if "[VALUE]" in payload:
-                        continue
+                    mask = _placeholders_mask(payload)
 
-                    if "[DIRVALUE]" in payload:
+                    # Ignore payloads reusing existing parameter values
+                    if mask & _VALUE_MASK:
                         continue
 
-                    if ("[FILE_NAME]" in payload or "[FILE_NOEXT]" in payload) and not request.file_name:
+                    if not file_name and mask & _FILE_NAME_MASK:
                         continue
 
-                    payload = payload.replace("[FILE_NAME]", request.file_name)
-                    payload = payload.replace("[FILE_NOEXT]", splitext(request.file_name)[0])
-
-                    if isinstance(request.path_id, int):
-                        payload = payload.replace("[PATH_ID]", str(request.path_id))
-
-                    payload = payload.replace(
-                        "[PARAM_AS_HEX]",
-                        hexlify(b"QUERY_STRING").decode()
-                    )
+                    if mask:
+                        payload = _replace_placeholders(payload, placeholders)
 
                     evil_req = Request(
                         f"{request.path}?{quote(payload)}",
@@ -529,6 +561,8 @@ class FileMutator:
         get_params = request.get_params
         post_params = request.post_params
         referer = request.referer
+        request_placeholders = _request_placeholders(request)
+        file_name = request_placeholders["FILE_NAME"]
 
         for i in range(len(request.file_params)):
             new_params = request.file_params
@@ -540,22 +574,20 @@ class FileMutator:
             if self._parameters and param_name not in self._parameters:
                 continue
 
+            placeholders = dict(
+                request_placeholders,
+                PARAM_AS_HEX=_hex_param(param_name)
+            )
+
             for payload, original_flags in self.iter_payloads():
+                mask = _placeholders_mask(payload)
 
-                if ("[FILE_NAME]" in payload or "[FILE_NOEXT]" in payload) and not request.file_name:
+                if not file_name and mask & _FILE_NAME_MASK:
                     continue
 
                 # no quoting: send() will do it for us
-                payload = payload.replace("[FILE_NAME]", request.file_name)
-                payload = payload.replace("[FILE_NOEXT]", splitext(request.file_name)[0])
-
-                if isinstance(request.path_id, int):
-                    payload = payload.replace("[PATH_ID]", str(request.path_id))
-
-                payload = payload.replace(
-                    "[PARAM_AS_HEX]",
-                    hexlify(param_name.encode("utf-8", errors="replace")).decode()
-                )
+                if mask:
+                    payload = _replace_placeholders(payload, placeholders)
 
                 # httpx needs bytes as content value
                 new_params[i][1] = ("content.xml", payload.encode(errors="replace"), "text/xml")
@@ -580,36 +612,41 @@ class PayloadReader:
     def __init__(self, options):
         self._timeout = options["timeout"]
         self._endpoint_url = options.get("external_endpoint", "http://wapiti3.ovh/")
+        self._substitutions = {
+            "[TAB]": "\t",
+            "[LF]": "\n",
+            "[FF]": "\f",  # Form feed
+            "[TIME]": str(int(ceil(self._timeout)) + 1),
+            "[EXTERNAL_ENDPOINT]": self._endpoint_url,
+            "[TIMEOUT]": "",
+            "\\0": "\0"
+        }
 
     def read_payloads(self, filename):
-        """returns a array"""
-        lines = []
+        """yields (payload, flags) tuples while reading the file, duplicates are only yielded the first time"""
+        seen = set()
         try:
             with open(filename, errors="ignore", encoding='utf-8') as file:
                 for line in file:
                     clean_line, flags = self.process_line(line)
-                    if clean_line:
-                        lines.append((clean_line, flags))
+                    if clean_line and (clean_line, flags) not in seen:
+                        seen.add((clean_line, flags))
+                        yield sys.intern(clean_line), flags
         except IOError as exception:
             print(exception)
-        return lines
 
     def process_line(self, line):
-        flag_type = PayloadType.pattern
         clean_line = line.strip(" \n")
-        clean_line = clean_line.replace("[TAB]", "\t")
-        clean_line = clean_line.replace("[LF]", "\n")
-        clean_line = clean_line.replace("[FF]", "\f")  # Form feed
-        clean_line = clean_line.replace("[TIME]", str(int(ceil(self._timeout)) + 1))
-        clean_line = clean_line.replace("[EXTERNAL_ENDPOINT]", self._endpoint_url)
-
-        if "[TIMEOUT]" in clean_line:
-            flag_type = PayloadType.time
-            clean_line = clean_line.replace("[TIMEOUT]", "")
+        flag_type = PayloadType.time if "[TIMEOUT]" in clean_line else PayloadType.pattern
+        clean_line = _PAYLOAD_FILE_TAGS_RE.sub(lambda match: self._substitutions[match.group(0)], clean_line)
+        return clean_line, Flags(payload_type=flag_type)
 
-        clean_line = clean_line.replace("\\0", "\0")
 
-        return clean_line, Flags(payload_type=flag_type)
+@lru_cache(maxsize=32)
+def _load_payloads(filename: str, timeout: float, external_endpoint: str) -> list:
+    """Parse a payload file only once per process for a given timeout and endpoint"""
+    reader = PayloadReader({"timeout": timeout, "external_endpoint": external_endpoint})
+    return list(reader.read_payloads(filename))
 
 
 if __name__ == "__main__":
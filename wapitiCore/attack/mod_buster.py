@@ -18,6 +18,8 @@
 # along with this program; if not, write to the Free Software
 # Foundation, Inc., 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
 import asyncio
+from collections import deque
+from itertools import filterfalse
 
 from httpx import RequestError
 
@@ -32,6 +34,7 @@ class ModuleBuster(Attack):
     """
 
     PAYLOADS_FILE = "busterPayloads.txt"
+    MAX_PARALLEL_DIRECTORIES = 8
 
     name = "buster"
 
@@ -40,10 +43,20 @@ class ModuleBuster(Attack):
 
     def __init__(self, crawler, persister, attack_options, stop_event):
         Attack.__init__(self, crawler, persister, attack_options, stop_event)
-        self.known_dirs = []
-        self.known_pages = []
-        self.new_resources = []
+        self.known_dirs = set()
+        self.known_pages = set()
+        # Discovered resources waiting to be processed, in the order they were found
+        self.new_resources = deque()
+        # Every resource either known or waiting in new_resources
+        self._known_resources = set()
         self.network_errors = 0
+        self._tasks = self.options.get("tasks", 32)
+        self._semaphore = asyncio.Semaphore(self._tasks)
+
+    def add_new_resource(self, url: str):
+        if url not in self._known_resources:
+            self._known_resources.add(url)
+            self.new_resources.append(url)
 
     async def check_path(self, url):
         page = Request(url)
@@ -57,15 +70,15 @@ class ModuleBuster(Attack):
             loc = response.redirection_url
             if response.is_directory_redirection:
                 log_red(f"Found webpage {loc}")
-                self.new_resources.append(loc)
+                self.add_new_resource(loc)
             else:
                 log_red(f"Found webpage {page.path}")
-                self.new_resources.append(page.path)
+                self.add_new_resource(page.path)
             return True
 
         if response.status not in [403, 404, 429]:
             log_red(f"Found webpage {page.path}")
-            self.new_resources.append(page.path)
+            self.add_new_resource(page.path)
             return True
 
         return False
@@ -75,7 +88,8 @@ class ModuleBuster(Attack):
 
         test_page = Request(path + "does_n0t_exist.htm")
         try:
-            response = await self.crawler.async_send(test_page)
+            async with self._semaphore:
+                response = await self.crawler.async_send(test_page)
         except RequestError:
             self.network_errors += 1
             return
@@ -84,42 +98,30 @@ class ModuleBuster(Attack):
             # we don't want to deal with this at the moment
             return
 
-        tasks = set()
-        pending_count = 0
-        payload_iterator = iter(self.payloads)
-
-        while True:
-            if pending_count < self.options["tasks"] and not self._stop_event.is_set():
-                try:
-                    candidate, __ = next(payload_iterator)
-                except StopIteration:
-                    pass
-                else:
-                    url = path + candidate
-                    if url not in self.known_dirs and url not in self.known_pages and url not in self.new_resources:
-                        task = asyncio.create_task(self.check_path(url))
-                        tasks.add(task)
-
-            if not tasks:
+        # Resources are filtered lazily so the ones found while exploring this directory are skipped too
+        candidates = filterfalse(
+            self._known_resources.__contains__,
+            [path + candidate for candidate, __ in self.payloads]
+        )
+
+        async def worker():
+            # Workers share the candidates iterator, the semaphore is shared by every explored directory
+            for url in candidates:
+                if self._stop_event.is_set():
+                    break
+                async with self._semaphore:
+                    await self.check_path(url)
+
+        await asyncio.gather(*(worker() for __ in range(self._tasks)))
+
+    async def test_directories(self, directories: list):
+        # Explore several directories at once, the number of requests in flight is still bounded by the semaphore
+        for i in range(0, len(directories), self.MAX_PARALLEL_DIRECTORIES):
+            if self._stop_event.is_set():
                 break
-
-            done_tasks, pending_tasks = await asyncio.wait(
-                tasks,
-                timeout=0.01,
-                return_when=asyncio.FIRST_COMPLETED
+            await asyncio.gather(
+                *(self.test_directory(path) for path in directories[i:i + self.MAX_PARALLEL_DIRECTORIES])
             )
-            pending_count = len(pending_tasks)
-            for task in done_tasks:
-                try:
-                    await task
-                except RequestError:
-                    self.network_errors += 1
-                tasks.remove(task)
-
-            if self._stop_event.is_set():
-                for task in pending_tasks:
-                    task.cancel()
-                    tasks.remove(task)
 
     async def attack(self, request: Request):
         self.finished = True
@@ -130,24 +132,24 @@ class ModuleBuster(Attack):
         async for resource in self.persister.get_links(attack_module=self.name):
             path = resource.path
             if path.endswith("/"):
-                if path not in self.known_dirs:
-                    self.known_dirs.append(path)
+                self.known_dirs.add(path)
             else:
-                if path not in self.known_pages:
-                    self.known_pages.append(path)
+                self.known_pages.add(path)
+            self._known_resources.add(path)
 
         # Then for each known webdirs we look for unknown webpages inside
-        for current_dir in self.known_dirs:
-            if self._stop_event.is_set():
-                break
-            await self.test_directory(current_dir)
+        await self.test_directories(list(self.known_dirs))
 
         # Finally, for each discovered webdirs we look for more webpages
         while self.new_resources and not self._stop_event.is_set():
-            current_res = self.new_resources.pop(0)
-            if current_res.endswith("/"):
-                # Mark as known then explore
-                self.known_dirs.append(current_res)
-                await self.test_directory(current_res)
-            else:
-                self.known_pages.append(current_res)
+            new_dirs = []
+            while self.new_resources:
+                current_res = self.new_resources.popleft()
+                if current_res.endswith("/"):
+                    # Mark as known then explore
+                    self.known_dirs.add(current_res)
+                    new_dirs.append(current_res)
+                else:
+                    self.known_pages.add(current_res)
+
+            await self.test_directories(new_dirs)
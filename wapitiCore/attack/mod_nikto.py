@@ -20,7 +20,6 @@ import asyncio
 import csv
 import re
 import os
-import random
 from urllib.parse import urlparse
 from typing import List
 
@@ -72,9 +71,7 @@ class ModuleNikto(Attack):
     def __init__(self, crawler, persister, attack_options, stop_event):
         Attack.__init__(self, crawler, persister, attack_options, stop_event)
         self.user_config_dir = self.persister.CONFIG_DIR
-        self.junk_string = "w" + "".join(
-            [random.choice("0123456789abcdefghjijklmnopqrstuvwxyz") for __ in range(0, 5000)]
-        )
+        self.junk_string = random_string(length=5001)
         self.parts = None
 
         if not os.path.isdir(self.user_config_dir):
@@ -22,6 +22,7 @@ import os
 from urllib.parse import urlparse
 from time import strftime, gmtime
 from importlib import import_module
+from importlib.util import find_spec
 from operator import attrgetter
 from traceback import print_tb
 from collections import deque
@@ -597,6 +598,14 @@ class Wapiti:
         """Set a proxy to use for HTTP requests."""
         self.crawler.set_proxy(proxy)
 
+    def set_http2(self, enabled: bool):
+        """Set whether HTTP/2 should be negotiated with the target."""
+        self.crawler.http2 = enabled
+
+    def set_max_connections(self, limit: int):
+        """Set the size of the HTTP connection pool shared by concurrent tasks"""
+        self.crawler.max_connections = limit
+
     def add_start_url(self, url: str):
         """Specify an URL to start the scan with. Can be called several times."""
         self._start_urls.append(url)
@@ -1068,6 +1077,12 @@ async def wapiti_main():
         choices=[0, 1]
     )
 
+    parser.add_argument(
+        "--http2",
+        action="store_true",
+        help=_("Use HTTP/2 when the target supports it (requires the h2 package)")
+    )
+
     parser.add_argument(
         "--color",
         action="store_true",
@@ -1146,6 +1161,10 @@ async def wapiti_main():
         logging.error(_("Number of concurrent tasks must be 1 or above!"))
         sys.exit(2)
 
+    if args.http2 and find_spec("h2") is None:
+        logging.error(_("HTTP/2 support requires the h2 package: pip install wapiti3[HTTP2]"))
+        sys.exit(2)
+
     if args.scope == "punk":
         print(_("[*] Do you feel lucky punk?"))
 
@@ -1273,6 +1292,9 @@ async def wapiti_main():
         wap.set_report_generator_type(args.format)
 
         wap.set_verify_ssl(bool(args.check_ssl))
+        wap.set_max_connections(args.tasks)
+        if args.http2:
+            wap.set_http2(True)
 
         attack_options = {
             "level": args.level,
@@ -166,12 +166,15 @@ class AsyncCrawler:
             self._client.headers["Accept-Encoding"] = "identity"
 
         self._secure = secure
+        self._http2 = False
         self._proxies = None
-        self._transport = None
+        self._socks_proxy = None
         self._drop_cookies = False
         self._cookies = None
 
         self._client = None
+        # Same values as httpx defaults until max_connections is set
+        self._limits = httpx.Limits(max_keepalive_connections=20, max_connections=100)
         self._auth_credentials = {}
         self._auth_method = "basic"
         self._auth = None
@@ -179,7 +182,7 @@ class AsyncCrawler:
     def set_proxy(self, proxy: str):
         """Set a proxy to use for HTTP requests."""
         self._client = None
-        self._transport = None
+        self._socks_proxy = None
         self._proxies = None
 
         url_parts = urlparse(proxy)
@@ -189,7 +192,7 @@ class AsyncCrawler:
             raise ValueError(f"Unknown proxy type: {protocol}")
 
         if protocol == "socks":
-            self._transport = AsyncProxyTransport.from_url(urlunparse(("socks5", url_parts.netloc, '/', '', '', '')))
+            self._socks_proxy = urlunparse(("socks5", url_parts.netloc, '/', '', '', ''))
         else:
             proxy_url = urlunparse((url_parts.scheme, url_parts.netloc, '/', '', '', ''))
             self._proxies = {"http://": proxy_url, "https://": proxy_url}
@@ -198,6 +201,11 @@ class AsyncCrawler:
     def client(self):
         # Construct or reconstruct an AsyncClient instance using parameters
         if self._client is None:
+            transport = None
+            if self._socks_proxy:
+                # httpx ignores limits and http2 when a transport is given, they must be set on the transport
+                transport = AsyncProxyTransport.from_url(self._socks_proxy, limits=self._limits, http2=self._http2)
+
             self._client = httpx.AsyncClient(
                 auth=self._auth,
                 headers=self._headers,
@@ -206,7 +214,9 @@ class AsyncCrawler:
                 proxies=self._proxies,
                 timeout=self._timeout,
                 event_hooks={"request": [drop_cookies_from_request]} if self._drop_cookies else None,
-                transport=self._transport
+                transport=transport,
+                limits=self._limits,
+                http2=self._http2
             )
 
             self._client.max_redirects = 5
@@ -224,6 +234,29 @@ class AsyncCrawler:
             self._client = None
             self._secure = value
 
+    @property
+    def http2(self):
+        return self._http2
+
+    @http2.setter
+    def http2(self, value: bool):
+        if value != self._http2:
+            # Requires the h2 package (httpx[http2]). Concurrent requests are then multiplexed over fewer connections.
+            self._client = None
+            self._http2 = value
+
+    @property
+    def max_connections(self):
+        return self._limits.max_connections
+
+    @max_connections.setter
+    def max_connections(self, value: int):
+        if value != self._limits.max_connections:
+            # Pool limits are given to the AsyncClient constructor so it must be created again.
+            # Keep-alive connections are reused by every concurrent task hitting the target.
+            self._client = None
+            self._limits = httpx.Limits(max_keepalive_connections=value, max_connections=value)
+
     @property
     def timeout(self):
         return self._timeout
@@ -579,7 +612,9 @@ class AsyncCrawler:
         return page
 
     async def close(self):
-        await self.client.aclose()
+        # Don't build a client only to close it
+        if self._client is not None:
+            await self._client.aclose()
 
 
 class Explorer:
@@ -554,86 +554,85 @@ class SqlPersister:
             referer=request.referer,
             evil=True
         )
+        # Everything is written in the same transaction so a finding only costs one commit
         async with self._engine.begin() as conn:
             result = await conn.execute(statement)
-        # path_id is the ID of the evil path
-        path_id = result.inserted_primary_key[0]
-
-        all_values = []
-        for i, (get_param_key, get_param_value) in enumerate(request.get_params):
-            all_values.append(
-                {
-                    "path_id": path_id,
-                    "type": "GET",
-                    "position": i,
-                    "name": get_param_key,
-                    "value1": get_param_value,
-                    "value2": None,
-                    "meta": None
-                }
-            )
+            # path_id is the ID of the evil path
+            path_id = result.inserted_primary_key[0]
 
-        post_params = request.post_params
-        if isinstance(post_params, list):
-            for i, (post_param_key, post_param_value) in enumerate(request.post_params):
+            all_values = []
+            for i, (get_param_key, get_param_value) in enumerate(request.get_params):
                 all_values.append(
                     {
                         "path_id": path_id,
-                        "type": "POST",
+                        "type": "GET",
                         "position": i,
-                        "name": post_param_key,
-                        "value1": post_param_value,
+                        "name": get_param_key,
+                        "value1": get_param_value,
                         "value2": None,
                         "meta": None
                     }
                 )
-        elif post_params:
-            all_values.append(
-                {
-                    "path_id": path_id,
-                    "type": "POST",
-                    "position": 0,
-                    "name": "__RAW__",
-                    "value1": post_params,
-                    "value2": None,
-                    "meta": None
-                }
-            )
 
-        for i, (file_param_key, file_param_value) in enumerate(request.file_params):
-            if len(file_param_value) == 3:
-                meta = file_param_value[2]
-            else:
-                meta = None
-
-            all_values.append(
-                {
-                    "path_id": path_id,
-                    "type": "FILE",
-                    "position": i,
-                    "name": file_param_key,
-                    "value1": file_param_value[0],
-                    "value2": file_param_value[1],
-                    "meta": meta
-                }
-            )
+            post_params = request.post_params
+            if isinstance(post_params, list):
+                for i, (post_param_key, post_param_value) in enumerate(request.post_params):
+                    all_values.append(
+                        {
+                            "path_id": path_id,
+                            "type": "POST",
+                            "position": i,
+                            "name": post_param_key,
+                            "value1": post_param_value,
+                            "value2": None,
+                            "meta": None
+                        }
+                    )
+            elif post_params:
+                all_values.append(
+                    {
+                        "path_id": path_id,
+                        "type": "POST",
+                        "position": 0,
+                        "name": "__RAW__",
+                        "value1": post_params,
+                        "value2": None,
+                        "meta": None
+                    }
+                )
 
-        if all_values:
-            async with self._engine.begin() as conn:
+            for i, (file_param_key, file_param_value) in enumerate(request.file_params):
+                if len(file_param_value) == 3:
+                    meta = file_param_value[2]
+                else:
+                    meta = None
+
+                all_values.append(
+                    {
+                        "path_id": path_id,
+                        "type": "FILE",
+                        "position": i,
+                        "name": file_param_key,
+                        "value1": file_param_value[0],
+                        "value2": file_param_value[1],
+                        "meta": meta
+                    }
+                )
+
+            if all_values:
                 await conn.execute(self.params.insert(), all_values)
 
-        # request_id is the ID of the original (legit) request
-        statement = self.payloads.insert().values(
-            evil_path_id=path_id,
-            original_path_id=request_id,
-            module=module,
-            category=category,
-            level=level,
-            parameter=parameter,
-            info=info,
-            type=payload_type
-        )
-        async with self._engine.begin() as conn:
+            # request_id is the ID of the original (legit) request
+            statement = self.payloads.insert().values(
+                evil_path_id=path_id,
+                original_path_id=request_id,
+                module=module,
+                category=category,
+                level=level,
+                parameter=parameter,
+                info=info,
+                type=payload_type
+            )
             await conn.execute(statement)
 
     async def get_path_by_id(self, path_id):
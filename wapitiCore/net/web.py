@@ -175,6 +175,8 @@ class Request:
         self._cached_encoded_data = None
         self._cached_encoded_files = None
         self._cached_hash = None
+        self._cached_http_repr = None
+        self._cached_curl_repr = None
 
         self._cached_hash_params = None
         self._status = None
@@ -360,6 +362,14 @@ class Request:
         return buff
 
     def http_repr(self, left_margin="    "):
+        # Only requests ending up in a report are dumped, don't allocate the cache for the others
+        if self._cached_http_repr is None:
+            self._cached_http_repr = {}
+        if left_margin not in self._cached_http_repr:
+            self._cached_http_repr[left_margin] = self._http_repr(left_margin)
+        return self._cached_http_repr[left_margin]
+
+    def _http_repr(self, left_margin: str) -> str:
         rel_url = self.url.split('/', 3)[3]
         http_string = f"{left_margin}{self._method} /{rel_url} HTTP/1.1\n{left_margin}Host: {self._hostname}\n"
 
@@ -394,6 +404,11 @@ class Request:
 
     @property
     def curl_repr(self):
+        if self._cached_curl_repr is None:
+            self._cached_curl_repr = self._curl_repr()
+        return self._cached_curl_repr
+
+    def _curl_repr(self) -> str:
         curl_string = f"curl \"{shell_escape(self.url)}\""
         if self._referer:
             curl_string += f" -e \"{shell_escape(self._referer)}\""
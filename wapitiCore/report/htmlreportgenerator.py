@@ -21,13 +21,55 @@
 
 import os
 import sys
-from shutil import copytree, rmtree, copy
+from shutil import copyfile, rmtree
 from urllib.parse import urlparse
 import time
 
+from mako.runtime import Context
 from mako.template import Template
 
-from wapitiCore.report.jsonreportgenerator import JSONReportGenerator
+from wapitiCore.report.jsonreportgenerator import JSONReportGenerator, WRITE_BUFFER_SIZE
+
+
+def _sync_tree(src: str, dst: str, prune: bool = False):
+    """
+    Copy the content of src into dst, skipping files whose size and modification time did not change.
+    Sub-directories are mirrored: entries missing from src are removed from them. If prune is set, this also
+    applies to dst itself (the top-level output directory keeps previously generated reports).
+    """
+    os.makedirs(dst, exist_ok=True)
+    names = set()
+    with os.scandir(src) as entries:
+        for entry in entries:
+            names.add(entry.name)
+            dst_path = os.path.join(dst, entry.name)
+            if entry.is_dir():
+                _sync_tree(entry.path, dst_path, prune=True)
+                continue
+
+            src_stat = entry.stat()
+            try:
+                dst_stat = os.stat(dst_path)
+            except FileNotFoundError:
+                pass
+            else:
+                if dst_stat.st_size == src_stat.st_size and dst_stat.st_mtime == src_stat.st_mtime:
+                    continue
+
+            # Keep the source mtime so unchanged files are skipped next time
+            copyfile(entry.path, dst_path)
+            os.utime(dst_path, ns=(src_stat.st_atime_ns, src_stat.st_mtime_ns))
+
+    if prune:
+        # Remove assets left over from an older version of the template
+        with os.scandir(dst) as entries:
+            for entry in entries:
+                if entry.name in names:
+                    continue
+                if entry.is_dir(follow_symlinks=False):
+                    rmtree(entry.path)
+                else:
+                    os.remove(entry.path)
 
 
 class HTMLReportGenerator(JSONReportGenerator):
@@ -38,9 +80,32 @@ class HTMLReportGenerator(JSONReportGenerator):
     def __init__(self):
         super().__init__()
         self._final__path = None
+        self._filename = None
 
     BASE_DIR = os.path.dirname(sys.modules["wapitiCore"].__file__)
     REPORT_DIR = "report_template"
+    _TEMPLATE = None
+
+    @classmethod
+    def template_dir(cls) -> str:
+        """Directory holding report.html and the assets copied next to the generated reports."""
+        return os.path.join(cls.BASE_DIR, cls.REPORT_DIR)
+
+    @classmethod
+    def _get_template(cls) -> Template:
+        """Return the compiled report template, parsing it on first use only."""
+        if cls.__dict__.get("_TEMPLATE") is None:
+            cls._TEMPLATE = Template(
+                filename=os.path.join(cls.template_dir(), "report.html"),
+                input_encoding="utf-8"
+            )
+        return cls._TEMPLATE
+
+    def set_report_info(self, target, scope, date, version, auth, crawled_pages: int):
+        super().set_report_info(target, scope, date, version, auth, crawled_pages)
+        report_target_name = urlparse(target).netloc.replace(':', '_')
+        report_time = time.strftime('%m%d%Y_%H%M', date)
+        self._filename = f"{report_target_name}_{report_time}.html"
 
     def generate_report(self, output_path):
         """
@@ -48,34 +113,17 @@ class HTMLReportGenerator(JSONReportGenerator):
         If this directory already exists, overwrite the template files and add the HTML report.
         (This way we keep previous generated HTML files).
         """
-        if os.path.isdir(output_path):
-            for subdir in ("css", "js"):
-                try:
-                    rmtree(os.path.join(output_path, subdir))
-                except FileNotFoundError:
-                    pass
-
-                copytree(os.path.join(self.BASE_DIR, self.REPORT_DIR, subdir), os.path.join(output_path, subdir))
-            copy(os.path.join(self.BASE_DIR, self.REPORT_DIR, "logo_clear.png"), output_path)
-        else:
-            copytree(os.path.join(self.BASE_DIR, self.REPORT_DIR), output_path)
-
-        mytemplate = Template(
-            filename=os.path.join(self.BASE_DIR, self.REPORT_DIR, "report.html"),
-            input_encoding="utf-8",
-            output_encoding="utf-8"
-        )
-
-        report_target_name = urlparse(self._infos['target']).netloc.replace(':', '_')
-        report_time = time.strftime('%m%d%Y_%H%M', self._date)
-
-        filename = f"{report_target_name}_{report_time}.html"
-
-        self._final__path = os.path.join(output_path, filename)
-
-        with open(self._final__path, "w", encoding='utf-8') as html_report_file:
-            html_report_file.write(
-                mytemplate.render_unicode(
+        _sync_tree(self.template_dir(), output_path)
+
+        mytemplate = self._get_template()
+
+        self._final__path = os.path.join(output_path, self._filename)
+
+        # Let the template write straight to the file instead of building the whole report in memory first
+        with open(self._final__path, "w", encoding="utf-8", newline="", buffering=WRITE_BUFFER_SIZE) as html_file:
+            mytemplate.render_context(
+                Context(
+                    html_file,
                     wapiti_version=self._infos["version"],
                     target=self._infos["target"],
                     scan_date=self._infos["date"],
@@ -19,9 +19,19 @@
 # along with this program; if not, write to the Free Software
 # Foundation, Inc., 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
 import json
+import sys
+
+try:
+    # Much faster serialization when available
+    import orjson
+except ImportError:
+    orjson = None
 
 from wapitiCore.report.reportgenerator import ReportGenerator
 
+# json.dump and the Mako template of the HTML report write piece by piece, avoid doing a syscall for every 8 KiB
+WRITE_BUFFER_SIZE = 1024 * 1024
+
 
 class JSONReportGenerator(ReportGenerator):
     """This class allow generating reports in JSON format.
@@ -31,10 +41,14 @@ class JSONReportGenerator(ReportGenerator):
     - anomalies : same as vulnerabilities but used only for error messages and timeouts (items of less importance).
     - additionals : some additional information about the target.
     - infos : several informations about the scan.
+    With minimal set, findings don't carry the HTTP request and the cURL command used to reproduce them.
+    The output is compact unless pretty is set, in which case it is indented with 2 spaces.
     """
 
-    def __init__(self):
+    def __init__(self, minimal=False, pretty=False):
         super().__init__()
+        self._minimal = minimal
+        self._pretty = pretty
         # Use only one dict for vulnerability, anomaly and additional types
         self._flaw_types = {}
 
@@ -54,94 +68,67 @@ class JSONReportGenerator(ReportGenerator):
             "additionals": self._additionals,
             "infos": self._infos
         }
-        with open(output_path, "w", encoding='utf-8') as json_report_file:
-            json.dump(report_dict, json_report_file, indent=2)
+        if orjson is not None:
+            option = orjson.OPT_NON_STR_KEYS
+            if self._pretty:
+                option |= orjson.OPT_INDENT_2
+            with open(output_path, "wb") as json_report_file:
+                json_report_file.write(orjson.dumps(report_dict, option=option))
+        else:
+            with open(output_path, "w", encoding='utf-8', buffering=WRITE_BUFFER_SIZE) as json_report_file:
+                # The report is built by us and holds no cycles, and the file is UTF-8: skip both safety nets
+                options = {"ensure_ascii": False, "check_circular": False}
+                if self._pretty:
+                    json.dump(report_dict, json_report_file, indent=2, **options)
+                else:
+                    json.dump(report_dict, json_report_file, separators=(",", ":"), **options)
+
+    def _make_entry(self, module: str, level, request, parameter: str, info: str) -> dict:
+        """Build the dictionary describing a vulnerability, an anomaly or an additional."""
+        # Methods, module names and parameter names repeat across findings: share a single copy of each
+        entry = {
+            "method": sys.intern(request.method),
+            "path": request.file_path,
+            "info": info,
+            "level": level,
+            "parameter": sys.intern(parameter) if parameter else parameter,
+            "referer": request.referer,
+            "module": sys.intern(module)
+        }
+        if not self._minimal:
+            entry["http_request"] = request.http_repr(left_margin="")
+            entry["curl_command"] = request.curl_repr
+        return entry
+
+    def _add_flaw_type(self, storage: dict, name, description, solution, references):
+        """Register a type of flaw and give it an empty list of findings in the given storage."""
+        self._flaw_types.setdefault(name, {"desc": description, "sol": solution, "ref": references})
+        storage.setdefault(name, [])
 
     # Vulnerabilities
     def add_vulnerability_type(self, name, description="", solution="", references=None):
         """Add informations on a type of vulnerability"""
-        if name not in self._flaw_types:
-            self._flaw_types[name] = {
-                "desc": description,
-                "sol": solution,
-                "ref": references
-            }
-        if name not in self._vulns:
-            self._vulns[name] = []
+        self._add_flaw_type(self._vulns, name, description, solution, references)
 
     def add_vulnerability(self, module: str, category=None, level=0, request=None, parameter="", info=""):
         """
         Store the informations about a found vulnerability.
         """
-
-        vuln_dict = {
-            "method": request.method,
-            "path": request.file_path,
-            "info": info,
-            "level": level,
-            "parameter": parameter,
-            "referer": request.referer,
-            "module": module,
-            "http_request": request.http_repr(left_margin=""),
-            "curl_command": request.curl_repr,
-        }
-        if category not in self._vulns:
-            self._vulns[category] = []
-        self._vulns[category].append(vuln_dict)
+        self._vulns.setdefault(category, []).append(self._make_entry(module, level, request, parameter, info))
 
     # Anomalies
     def add_anomaly_type(self, name, description="", solution="", references=None):
         """Register a type of anomaly"""
-        if name not in self._flaw_types:
-            self._flaw_types[name] = {
-                "desc": description,
-                "sol": solution,
-                "ref": references
-            }
-        if name not in self._anomalies:
-            self._anomalies[name] = []
+        self._add_flaw_type(self._anomalies, name, description, solution, references)
 
     def add_anomaly(self, module: str, category=None, level=0, request=None, parameter="", info=""):
         """Store the informations about an anomaly met during the attack."""
-        anom_dict = {
-            "method": request.method,
-            "path": request.file_path,
-            "info": info,
-            "level": level,
-            "parameter": parameter,
-            "referer": request.referer,
-            "module": module,
-            "http_request": request.http_repr(left_margin=""),
-            "curl_command": request.curl_repr
-        }
-        if category not in self._anomalies:
-            self._anomalies[category] = []
-        self._anomalies[category].append(anom_dict)
+        self._anomalies.setdefault(category, []).append(self._make_entry(module, level, request, parameter, info))
 
     def add_additional_type(self, name, description="", solution="", references=None):
         """Register a type of additional"""
-        if name not in self._flaw_types:
-            self._flaw_types[name] = {
-                "desc": description,
-                "sol": solution,
-                "ref": references
-            }
-        if name not in self._additionals:
-            self._additionals[name] = []
+        self._add_flaw_type(self._additionals, name, description, solution, references)
 
     def add_additional(self, module: str, category=None, level=0, request=None, parameter="", info=""):
         """Store the information about an additional."""
-        addition_dict = {
-            "method": request.method,
-            "path": request.file_path,
-            "info": info,
-            "level": level,
-            "parameter": parameter,
-            "referer": request.referer,
-            "module": module,
-            "http_request": request.http_repr(left_margin=""),
-            "curl_command": request.curl_repr
-        }
-        if category not in self._additionals:
-            self._additionals[category] = []
-        self._additionals[category].append(addition_dict)
+        self._additionals.setdefault(category, []).append(self._make_entry(module, level, request, parameter, info))